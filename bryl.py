@@ -1,15 +1,22 @@
 # bryl.py (FINAL, COMPLETE, and FIXED CODE)
 
-from flask import Flask, render_template, request, redirect, session, url_for, flash, get_flashed_messages
+from flask import Flask, render_template, request, redirect, session, url_for, flash, get_flashed_messages, jsonify
 from flask_sqlalchemy import SQLAlchemy
 import os
-from datetime import datetime
-from sqlalchemy.orm import joinedload
+import click
+from datetime import date, timedelta
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy import inspect
 from models.db import db
 from models.user import User, UserModel
 # CRITICAL: Ensure all Models are imported here
 from models.post import Post, PostModel, LoanModel, PaymentModel
-import math  # Import math for monthly payment calculation
+from models.money import to_cents, format_money, monthly_payment_cents
+from models.repository import LoanRepository
+from models.ledger import Ledger
+from models.snapshot import PortfolioSnapshot
+from profiler import init_profiler
+from streaming import stream_page, init_compression
 
 bryl = Flask(__name__)
 bryl.secret_key = "bryl_secret_key"
@@ -18,6 +25,13 @@ bryl.secret_key = "bryl_secret_key"
 bryl.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///loansystem.db"
 bryl.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+# Compiled templates are cached on disk and shared by every worker process, so only the
+# first process after a deploy parses them (or none, after 'flask compile-templates').
+# Must be configured before anything touches bryl.jinja_env.
+JINJA_CACHE_DIR = os.path.join(bryl.instance_path, "jinja_cache")
+os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+bryl.jinja_options = {**bryl.jinja_options, "bytecode_cache": FileSystemBytecodeCache(JINJA_CACHE_DIR)}
+
 # Initialize db *with* the app instance
 db.init_app(bryl)
 
@@ -25,6 +39,23 @@ db.init_app(bryl)
 # NOTE: User and Post objects are only used for their methods, they don't hold state
 user_repo = User(None)
 post_repo = Post(None)
+loan_repo = LoanRepository(None)
+ledger_repo = Ledger(None)
+snapshot_repo = PortfolioSnapshot(None)
+
+# Opt-in request profiler: set PROFILER_ENABLED=1 in the environment, then as an Admin
+# send 'X-Profile: 1' (or '?profile=1'). Dumps are written to instance/profiles/.
+bryl.config["PROFILER_ENABLED"] = os.environ.get("PROFILER_ENABLED") == "1"
+bryl.config["PROFILER_SAMPLE_RATE"] = float(os.environ.get("PROFILER_SAMPLE_RATE", "1.0"))
+bryl.config["PROFILER_MODE"] = os.environ.get("PROFILER_MODE", "cprofile")
+init_profiler(bryl)
+
+# gzip/brotli-compress text responses (including streamed pages) for clients that accept it
+init_compression(bryl)
+
+
+# Money is stored in cents; templates display it with {{ loan.amount_cents|peso }}
+bryl.add_template_filter(format_money, "peso")
 
 
 # --- Context Processor to make session variables available in all templates ---
@@ -67,11 +98,36 @@ def admin_required(f):
     return decorated_function
 
 
+# Rendered HTML of pages that look the same to every logged-out visitor, keyed by endpoint
+anonymous_page_cache = {}
+
+
+def cache_anonymous_page(f):
+    """Decorator that serves logged-out visitors a cached copy of a static page."""
+
+    def decorated_function(*args, **kwargs):
+        # Logged-in users and pending flash messages change the output; debug mode keeps edits visible
+        if 'user_id' in session or '_flashes' in session or bryl.debug:
+            return f(*args, **kwargs)
+
+        page = anonymous_page_cache.get(request.endpoint)
+        if page is None:
+            page = f(*args, **kwargs)
+            if not isinstance(page, str):  # Only cache rendered pages, never redirects
+                return page
+            anonymous_page_cache[request.endpoint] = page
+        return page
+
+    decorated_function.__name__ = f.__name__
+    return decorated_function
+
+
 # ------------------------------------------------------------------
 # --- GENERAL ROUTES (Home, Login, Logout, Info) ---
 # ------------------------------------------------------------------
 
 @bryl.route("/")
+@cache_anonymous_page
 def home():
     if 'email' in session:
         if session.get('role') == 'Admin':
@@ -146,18 +202,21 @@ def logout():
 
 
 @bryl.route("/about")
+@cache_anonymous_page
 def about():
     # Renders the 'about.html' template
     return render_template("about.html")
 
 
 @bryl.route("/contact")
+@cache_anonymous_page
 def contact():
     # Renders the 'contact.html' template
     return render_template("contact.html")
 
 
 @bryl.route("/forgot_password")
+@cache_anonymous_page
 def forgot_password():
     # Renders the 'forgot_password.html' template
     return render_template("forgot_password.html")
@@ -181,24 +240,15 @@ def dashboard():
     user_payments = []
     if is_approved:
         # Fetch approved loans
-        user_loans = LoanModel.query.filter_by(user_id=user_id, status='Approved').all()
+        user_loans = loan_repo.get_user_loans(user_id, status='Approved')
 
         # Calculate monthly payment for each loan
         # This is a basic example; real-world loan calculations are more complex.
         for loan in user_loans:
-            P = loan.amount  # Principal
-            r = loan.interest_rate / 100 / 12  # Monthly interest rate
-            n = loan.term_months  # Total number of payments
-
-            if r > 0 and n > 0:
-                # Formula for fixed-rate loan monthly payment
-                loan.monthly_payment = P * (r * (1 + r) ** n) / ((1 + r) ** n - 1)
-            else:
-                loan.monthly_payment = P / n if n > 0 else P
+            loan.monthly_payment_cents = monthly_payment_cents(loan.amount_cents, loan.interest_rate, loan.term_months)
 
         # Fetch approved payments
-        user_payments = PaymentModel.query.filter_by(user_id=user_id, status='Approved').order_by(
-            PaymentModel.payment_date.desc()).all()
+        user_payments = loan_repo.get_user_payments(user_id, status='Approved')
 
     return render_template(
         "dashboard.html",
@@ -231,7 +281,7 @@ def submit_loan():
 
     if request.method == 'POST':
         try:
-            loan_amount = float(request.form.get('loan_amount'))
+            loan_amount_cents = to_cents(request.form.get('loan_amount'))
             # --- CRITICAL FIX: Extract the new fields ---
             interest_rate = float(request.form.get('interest_rate'))
             term_months = int(request.form.get('term_months'))
@@ -239,9 +289,9 @@ def submit_loan():
             user_id = session.get('user_id')
 
             # --- CRITICAL FIX: Pass the new fields to your repository call ---
-            success = post_repo.create_loan(
+            success = loan_repo.create_loan(
                 user_id=user_id,
-                amount=loan_amount,
+                amount_cents=loan_amount_cents,
                 interest_rate=interest_rate,
                 term_months=term_months
             )
@@ -281,45 +331,35 @@ def payment():
 
     user_id = session['user_id']
     # Fetch all APPROVED loans that still have a balance
-    approved_loans = LoanModel.query.filter(
-        LoanModel.user_id == user_id,
-        LoanModel.status == 'Approved',
-        LoanModel.balance > 0
-    ).all()
+    approved_loans = loan_repo.get_payable_loans(user_id)
 
     if request.method == 'POST':
         try:
-            loan_id = request.form.get('loan_id')
-            amount = float(request.form.get('amount'))
+            loan_id = request.form.get('loan_id', type=int)
+            amount_cents = to_cents(request.form.get('amount'))
             method = request.form.get('method')
 
             # Basic validation
-            if not loan_id or amount <= 0 or not method:
+            if not loan_id or amount_cents <= 0 or not method:
                 flash("Invalid loan ID, amount, or payment method.", "danger")
                 return redirect(url_for('payment'))
 
-            loan = LoanModel.query.get(loan_id)
+            # Served from the repository cache filled by get_payable_loans() above; no extra query
+            loan = loan_repo.get_loan(loan_id)
             if not loan or loan.user_id != user_id or loan.status != 'Approved':
                 flash("Selected loan is not valid for payment.", "danger")
                 return redirect(url_for('payment'))
 
             # Check if payment amount exceeds the balance (optional but good practice)
-            if amount > loan.balance:
-                flash(f"Payment amount (₱{amount:,.2f}) cannot exceed the remaining balance (₱{loan.balance:,.2f}).",
-                      "danger")
+            if amount_cents > loan.balance_cents:
+                flash(f"Payment amount (₱{format_money(amount_cents)}) cannot exceed the remaining balance "
+                      f"(₱{format_money(loan.balance_cents)}).", "danger")
                 return redirect(url_for('payment'))
 
             # Create new payment request
-            new_payment = PaymentModel(
-                user_id=user_id,
-                loan_id=loan_id,
-                amount=amount,
-                method=method,
-                status='Pending',
-                payment_date=datetime.utcnow()
-            )
-            db.session.add(new_payment)
-            db.session.commit()
+            if not loan_repo.create_payment(user_id, loan_id, amount_cents, method):
+                flash("An unexpected error occurred during payment submission.", "danger")
+                return redirect(url_for('payment'))
 
             flash("Payment request submitted successfully! Awaiting administrator approval.", "success")
             return redirect(url_for('dashboard'))
@@ -371,19 +411,13 @@ def update_profile():
 @bryl.route("/admin_dashboard")
 @admin_required
 def admin_dashboard():
-    # Fetch overview counts
-    user_count = UserModel.query.count()
-    loan_count = LoanModel.query.count()
-    payment_count = PaymentModel.query.count()
-
-    # Fetch pending requests
-    pending_users = UserModel.query.filter_by(is_approved=False).all()
-
-    # Eager load the borrower for pending loans to access 'loan.borrower.fullname'
-    pending_loans = LoanModel.query.options(joinedload(LoanModel.borrower)).filter_by(status='Pending').all()
+    # Fetch overview counts (one query)
+    user_count, loan_count, payment_count = loan_repo.count_all()
 
-    # Eager load the borrower for pending payments
-    pending_payments = PaymentModel.query.options(joinedload(PaymentModel.borrower)).filter_by(status='Pending').all()
+    # Fetch pending requests as plain rows, with the borrower's name joined in
+    pending_users = loan_repo.list_users(approved=False).all()
+    pending_loans = loan_repo.list_loans(status='Pending').all()
+    pending_payments = loan_repo.list_payments(status='Pending').all()
 
     return render_template(
         "admin_dashboard.html",
@@ -421,13 +455,17 @@ def deny_user(user_id):
 @bryl.route("/admin/approve_loan/<int:loan_id>", methods=['POST'])
 @admin_required
 def approve_loan(loan_id):
-    loan = LoanModel.query.get(loan_id)
+    loan = loan_repo.get_loan(loan_id, with_borrower=True)
     if not loan:
         flash("Loan application not found.", "danger")
         return redirect(url_for('admin_dashboard'))
+    if loan.status != 'Pending':
+        flash(f"Loan ID {loan_id} has already been processed.", "warning")
+        return redirect(url_for('admin_dashboard'))
 
     try:
         loan.status = 'Approved'
+        ledger_repo.record_disbursement(loan)  # Committed together with the status change
         db.session.commit()
         flash(f"Loan ID {loan_id} for {loan.borrower.fullname} approved!", "success")
     except Exception:
@@ -440,7 +478,7 @@ def approve_loan(loan_id):
 @bryl.route("/admin/deny_loan/<int:loan_id>", methods=['POST'])
 @admin_required
 def deny_loan(loan_id):
-    loan = LoanModel.query.get(loan_id)
+    loan = loan_repo.get_loan(loan_id, with_borrower=True)
     if not loan:
         flash("Loan application not found.", "danger")
         return redirect(url_for('admin_dashboard'))
@@ -459,12 +497,15 @@ def deny_loan(loan_id):
 @bryl.route("/admin/approve_payment/<int:payment_id>", methods=['POST'])
 @admin_required
 def approve_payment(payment_id):
-    payment = PaymentModel.query.get(payment_id)
+    payment = loan_repo.get_payment(payment_id)
     if not payment:
         flash("Payment request not found.", "danger")
         return redirect(url_for('admin_dashboard'))
+    if payment.status != 'Pending':
+        flash(f"Payment ID {payment_id} has already been processed.", "warning")
+        return redirect(url_for('admin_dashboard'))
 
-    loan = LoanModel.query.get(payment.loan_id)
+    loan = loan_repo.get_loan(payment.loan_id)
     if not loan:
         flash("Associated loan not found.", "danger")
         return redirect(url_for('admin_dashboard'))
@@ -473,21 +514,22 @@ def approve_payment(payment_id):
         # 1. Update Payment Status to Approved
         payment.status = 'Approved'
 
-        # 2. Update Loan Balance by reducing the payment amount
-        loan.balance -= payment.amount
+        # 2. Update Loan Balance by reducing the payment amount, and record it in the ledger
+        ledger_repo.record_payment(payment, min(payment.amount_cents, loan.balance_cents))
+        loan.balance_cents -= payment.amount_cents
 
         # 3. Check for Loan Completion
         completion_message = ""
-        if loan.balance <= 0:
-            loan.balance = 0  # Ensure balance is not negative
+        if loan.balance_cents <= 0:
+            loan.balance_cents = 0  # Ensure balance is not negative
             loan.status = 'Completed'
             completion_message = f"Loan ID {loan.id} is now **COMPLETED**."
         else:
-            completion_message = f"Remaining Balance on Loan ID {loan.id}: ₱{loan.balance:,.2f}."
+            completion_message = f"Remaining Balance on Loan ID {loan.id}: ₱{format_money(loan.balance_cents)}."
 
         db.session.commit()
         flash(
-            f"Payment ID {payment_id} (₱{payment.amount:,.2f}) approved. {completion_message}",
+            f"Payment ID {payment_id} (₱{format_money(payment.amount_cents)}) approved. {completion_message}",
             "success")
 
     except Exception:
@@ -497,32 +539,118 @@ def approve_payment(payment_id):
     return redirect(url_for('admin_dashboard'))
 
 
+@bryl.route("/admin/reverse_payment/<int:payment_id>", methods=['POST'])
+@admin_required
+def reverse_payment(payment_id):
+    payment = loan_repo.get_payment(payment_id)
+    if not payment or payment.status != 'Approved':
+        flash("Only approved payments can be reversed.", "danger")
+        return redirect(url_for('view_all_payments'))
+
+    loan = loan_repo.get_loan(payment.loan_id)
+    try:
+        # Append a reversal entry instead of editing history, then restore the balance it covers
+        restored_cents = ledger_repo.record_reversal(payment)
+        if restored_cents is None:
+            flash(f"Payment ID {payment_id} predates the ledger and cannot be reversed until "
+                  f"'flask backfill-ledger' has been run.", "danger")
+            return redirect(url_for('view_all_payments'))
+        payment.status = 'Reversed'
+        loan.balance_cents += restored_cents
+        if loan.status == 'Completed' and loan.balance_cents > 0:
+            loan.status = 'Approved'
+        db.session.commit()
+        flash(f"Payment ID {payment_id} reversed. Balance on Loan ID {loan.id}: ₱{format_money(loan.balance_cents)}.",
+              "warning")
+    except Exception:
+        db.session.rollback()
+        flash(f"Failed to reverse payment ID {payment_id}.", "danger")
+
+    return redirect(url_for('view_all_payments'))
+
+
 # --- Admin View All Pages ---
 
+# Number of rows fetched from the database per batch while a listing streams
+STREAM_BATCH_SIZE = 500
+
 @bryl.route("/admin/users")
 @admin_required
 def view_all_users():
-    # Fetch all users, approved and pending
-    all_users = UserModel.query.order_by(UserModel.id.asc()).all()
-    return render_template("admin_view_all_users.html", all_users=all_users)
+    # Fetch all users, approved and pending; rows are fetched in batches while the page streams
+    all_users = loan_repo.list_users().yield_per(STREAM_BATCH_SIZE)
+    has_users = loan_repo.has_users()
+    return stream_page("admin_view_all_users.html", all_users=all_users, has_users=has_users)
 
 
 @bryl.route("/admin/loans")
 @admin_required
 def view_all_loans():
-    # Fetch all loans and eager load the borrower's full name
-    all_loans = LoanModel.query.options(joinedload(LoanModel.borrower)).order_by(
-        LoanModel.application_date.desc()).all()
-    return render_template("admin_view_all_loans.html", all_loans=all_loans)
+    # Fetch all loans with the borrower's full name as plain rows, in batches while the page streams
+    all_loans = loan_repo.list_loans().yield_per(STREAM_BATCH_SIZE)
+    has_loans = loan_repo.has_loans()
+    return stream_page("admin_view_all_loans.html", all_loans=all_loans, has_loans=has_loans)
 
 
 @bryl.route("/admin/payments")
 @admin_required
 def view_all_payments():
-    # Fetch all payments and eager load the borrower's full name
-    all_payments = PaymentModel.query.options(joinedload(PaymentModel.borrower)).order_by(
-        PaymentModel.payment_date.desc()).all()
-    return render_template("admin_view_all_payments.html", all_payments=all_payments)
+    # Fetch all payments with the borrower's full name as plain rows, in batches while the page streams
+    all_payments = loan_repo.list_payments().yield_per(STREAM_BATCH_SIZE)
+    has_payments = loan_repo.has_payments()
+    return stream_page("admin_view_all_payments.html", all_payments=all_payments, has_payments=has_payments)
+
+
+# --- Portfolio Aggregates (JSON) ---
+
+@bryl.route("/admin/portfolio/summary")
+@admin_required
+def portfolio_summary():
+    # Both figures are computed with SUM()/GROUP BY in SQL; no loan objects are loaded
+    return jsonify(
+        total_outstanding_cents=loan_repo.get_total_outstanding(),
+        status_totals=loan_repo.get_status_totals()
+    )
+
+
+@bryl.route("/admin/portfolio/collections")
+@admin_required
+def portfolio_collections():
+    period = request.args.get('period', 'month')
+    try:
+        collections = loan_repo.get_collections_by_period(period)
+    except ValueError:
+        return jsonify(error="period must be one of: day, month, year"), 400
+    return jsonify(period=period, collections=collections)
+
+
+# --- Portfolio Analytics (reads only the precomputed daily snapshots) ---
+
+ANALYTICS_DEFAULT_DAYS = 90
+ANALYTICS_MAX_DAYS = 3650  # Ten years; keeps date arithmetic in range for absurd ?days= values
+
+
+def get_analytics_history():
+    try:
+        days = min(max(1, int(request.args.get('days', ANALYTICS_DEFAULT_DAYS))), ANALYTICS_MAX_DAYS)
+    except ValueError:
+        days = ANALYTICS_DEFAULT_DAYS
+    return days, snapshot_repo.get_history(date.today() - timedelta(days=days))
+
+
+@bryl.route("/admin/analytics")
+@admin_required
+def analytics():
+    days, history = get_analytics_history()
+    # Newest first for the table
+    return render_template("admin_analytics.html", history=list(reversed(history)), days=days)
+
+
+@bryl.route("/admin/analytics.json")
+@admin_required
+def analytics_json():
+    days, history = get_analytics_history()
+    return jsonify(days=days, history=history)
 
 
 # --- INITIAL SETUP ---
@@ -542,6 +670,115 @@ def init_db():
             print("Default Admin user 'admin@test.com' created with password 'password'.")
 
 
+# Float money columns from before the switch to integer cents: {table: {new_column: old_column}}
+LEGACY_MONEY_COLUMNS = {
+    LoanModel.__table__: {'amount_cents': 'amount', 'balance_cents': 'balance'},
+    PaymentModel.__table__: {'amount_cents': 'amount'},
+}
+
+
+def migrate_money_to_cents():
+    """Rebuilds the loan/payment tables so money is stored as integer cents. Safe to run repeatedly."""
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        # Keep the payment -> loan foreign key pointing at 'loan' while the old table is renamed
+        conn.exec_driver_sql("PRAGMA legacy_alter_table = ON")
+        for table, renamed in LEGACY_MONEY_COLUMNS.items():
+            if not inspector.has_table(table.name):
+                continue
+            old_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            if set(renamed) <= old_columns:
+                continue  # Already migrated
+
+            legacy_name = f"{table.name}_legacy"
+            conn.exec_driver_sql(f"ALTER TABLE {table.name} RENAME TO {legacy_name}")
+            table.create(conn)
+
+            targets, sources = [], []
+            for column in table.columns:
+                if column.name in renamed:
+                    targets.append(column.name)
+                    sources.append(f"CAST(ROUND({renamed[column.name]} * 100) AS INTEGER)")
+                elif column.name in old_columns:
+                    targets.append(column.name)
+                    sources.append(column.name)
+            conn.exec_driver_sql(
+                f"INSERT INTO {table.name} ({', '.join(targets)}) SELECT {', '.join(sources)} FROM {legacy_name}")
+            conn.exec_driver_sql(f"DROP TABLE {legacy_name}")
+            print(f"Migrated '{table.name}' money columns to integer cents.")
+        conn.exec_driver_sql("PRAGMA legacy_alter_table = OFF")
+
+
+@bryl.cli.command("backfill-ledger")
+@click.option("--batch-size", default=500, show_default=True, help="Loans per batch.")
+def backfill_ledger(batch_size):
+    """Writes ledger history for approved/completed loans created before the ledger existed."""
+    with bryl.app_context():
+        db.create_all()
+        print(f"Backfilled ledger entries for {ledger_repo.backfill(loan_repo, batch_size)} loans.")
+
+
+@bryl.cli.command("verify-ledger")
+@click.option("--batch-size", default=500, show_default=True, help="Loans per batch.")
+def verify_ledger(batch_size):
+    """Re-derives every loan balance, current and at each snapshot, from the ledger and reports mismatches."""
+    with bryl.app_context():
+        mismatches = 0
+        for loan_id, at, stored, ledger_balance, snapshot_balance in ledger_repo.verify(batch_size):
+            mismatches += 1
+            if at is None:
+                print(f"Loan ID {loan_id}: stored ₱{format_money(stored)}, ledger ₱{format_money(ledger_balance)}, "
+                      f"snapshot+tail ₱{format_money(snapshot_balance)}")
+            else:
+                print(f"Loan ID {loan_id} as of {at:%Y-%m-%d %H:%M:%S}: ledger ₱{format_money(ledger_balance)}, "
+                      f"snapshot ₱{format_money(snapshot_balance)}")
+        if mismatches:
+            print(f"{mismatches} loan balance(s) do not match the ledger.")
+            raise SystemExit(1)
+        print("All loan balances match the ledger.")
+
+
+@bryl.cli.command("compile-templates")
+def compile_templates():
+    """Compiles every template into the shared bytecode cache. Run once after each deploy."""
+    names = bryl.jinja_env.list_templates(extensions=["html"])
+    for name in names:
+        bryl.jinja_env.get_template(name)
+    print(f"Compiled {len(names)} templates into {JINJA_CACHE_DIR}.")
+
+
+@bryl.cli.command("migrate-money")
+def migrate_money():
+    """Upgrades an existing database: converts float money columns to integer cents and creates missing tables."""
+    with bryl.app_context():
+        migrate_money_to_cents()
+        print("Money columns are stored as integer cents.")
+        # Tables added since the database was created (ledger, balance and portfolio snapshots)
+        db.create_all()
+        print("Missing tables created.")
+
+
+@bryl.cli.command("snapshot-portfolio")
+@click.option("--date", "day", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Day to snapshot (YYYY-MM-DD). Defaults to yesterday.")
+def snapshot_portfolio(day):
+    """Writes one day's portfolio aggregates. Schedule nightly (e.g. cron) after midnight."""
+    day = day.date() if day else date.today() - timedelta(days=1)
+    with bryl.app_context():
+        db.create_all()
+        snapshot_repo.take_snapshot(day)
+        print(f"Portfolio snapshot written for {day.isoformat()}.")
+
+
+@bryl.cli.command("backfill-snapshots")
+def backfill_snapshots():
+    """Rebuilds the whole snapshot history from application and payment dates."""
+    with bryl.app_context():
+        db.create_all()
+        days_written = snapshot_repo.backfill()
+        print(f"Backfilled {days_written} days of portfolio snapshots.")
+
+
 # ------------------------------------------------------------------
 # --- MAIN EXECUTION ---
 # ------------------------------------------------------------------
@@ -549,6 +786,7 @@ if __name__ == "__main__":
     # Ensure the database context is active for initial setup or immediate use
     with bryl.app_context():
         db.create_all()  # Ensure tables exist on run if they don't already
+        migrate_money_to_cents()  # Upgrade databases created before money was stored in cents
 
     # Run the Flask app
     bryl.run(debug=True)
\ No newline at end of file
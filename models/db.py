@@ -1,3 +1,18 @@
+import sqlite3
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+db = SQLAlchemy()
+
 
-db = SQLAlchemy()
\ No newline at end of file
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # Streamed listings keep a read cursor open while the client downloads the page. In
+    # WAL mode readers and writers don't block each other, so approvals, payments and
+    # registrations can still commit meanwhile. The setting is stored in the database file.
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
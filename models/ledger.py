@@ -0,0 +1,273 @@
+from .db import db
+from .post import LoanModel
+from datetime import datetime
+from sqlalchemy import and_, event, exists, func, tuple_
+from sqlalchemy.orm import aliased
+
+# Ledger entry types. amount_cents is signed: positive raises the balance owed, negative lowers it.
+DISBURSEMENT = 'disbursement'  # Loan approved: + principal
+PAYMENT = 'payment'            # Payment approved: - amount applied to the balance
+ACCRUAL = 'accrual'            # Interest or fees charged: + amount
+REVERSAL = 'reversal'          # Approved payment reversed: + amount that had been applied
+ENTRY_TYPES = (DISBURSEMENT, PAYMENT, ACCRUAL, REVERSAL)
+
+# -----------------------------------------------------------
+# 1. SQLAlchemy Model Definitions
+# -----------------------------------------------------------
+
+class LedgerEntryModel(db.Model):
+    """One balance-changing event. Rows are only ever inserted, never updated or deleted."""
+    __tablename__ = 'ledger_entry'
+    __table_args__ = (
+        db.Index('ix_ledger_entry_loan_id_created_at', 'loan_id', 'created_at', 'id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    loan_id = db.Column(db.Integer, db.ForeignKey('loan.id'), nullable=False)
+    entry_type = db.Column(db.String(20), nullable=False)
+    amount_cents = db.Column(db.Integer, nullable=False)
+    payment_id = db.Column(db.Integer, db.ForeignKey('payment.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"LedgerEntry('{self.id}', 'Loan ID: {self.loan_id}', '{self.entry_type}', {self.amount_cents})"
+
+
+class LoanBalanceSnapshotModel(db.Model):
+    """Checkpoint: a loan's balance after applying every ledger entry up to and including ledger_entry_id.
+
+    created_at is that entry's created_at, so (created_at, ledger_entry_id) is the snapshot's
+    position in the loan's (created_at, id) entry order.
+    """
+    __tablename__ = 'loan_balance_snapshot'
+    __table_args__ = (
+        db.Index('ix_loan_balance_snapshot_loan_id_created_at', 'loan_id', 'created_at', 'ledger_entry_id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    loan_id = db.Column(db.Integer, db.ForeignKey('loan.id'), nullable=False)
+    ledger_entry_id = db.Column(db.Integer, db.ForeignKey('ledger_entry.id'), nullable=False)
+    balance_cents = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"LoanBalanceSnapshot('Loan ID: {self.loan_id}', 'Entry: {self.ledger_entry_id}', {self.balance_cents})"
+
+
+@event.listens_for(LedgerEntryModel, 'before_update')
+@event.listens_for(LedgerEntryModel, 'before_delete')
+def reject_ledger_change(mapper, connection, target):
+    raise ValueError("Ledger entries are append-only; record a reversal instead.")
+
+
+# A loan's entries are ordered by (created_at, id), not by id alone: backfill inserts
+# history dated before entries that already exist. Snapshots use the same order.
+def entry_key(entry=LedgerEntryModel):
+    return tuple_(entry.created_at, entry.id)
+
+
+def snapshot_key(snapshot=LoanBalanceSnapshotModel):
+    return tuple_(snapshot.created_at, snapshot.ledger_entry_id)
+
+
+# -----------------------------------------------------------
+# 2. Repository Class
+# -----------------------------------------------------------
+
+class Ledger:
+    # A loan gets a balance snapshot once this many entries have accumulated since its last one
+    SNAPSHOT_INTERVAL = 20
+
+    def __init__(self, db_connection):
+        self.db = db_connection
+
+    # --- Writes (added to the caller's transaction; the caller commits) ---
+
+    def record(self, loan_id, entry_type, amount_cents, payment_id=None, created_at=None):
+        """Appends a ledger entry and writes a balance snapshot when the loan is due for one."""
+        if entry_type not in ENTRY_TYPES:
+            raise ValueError(f"Unknown ledger entry type: {entry_type}")
+
+        entry = LedgerEntryModel(loan_id=loan_id, entry_type=entry_type, amount_cents=amount_cents,
+                                 payment_id=payment_id, created_at=created_at or datetime.utcnow())
+        db.session.add(entry)
+        db.session.flush()  # Assigns entry.id
+
+        if created_at is not None:
+            # A backdated entry (backfill) may land before existing snapshots, which no longer cover it
+            LoanBalanceSnapshotModel.query.filter(
+                LoanBalanceSnapshotModel.loan_id == loan_id,
+                snapshot_key() > tuple_(entry.created_at, entry.id)
+            ).delete(synchronize_session=False)
+
+        snapshot = self._latest_snapshot(loan_id)
+        tail_count, tail_total = self._tail(loan_id, snapshot, until=entry)
+        if tail_count >= self.SNAPSHOT_INTERVAL:
+            db.session.add(LoanBalanceSnapshotModel(
+                loan_id=loan_id,
+                ledger_entry_id=entry.id,
+                balance_cents=(snapshot.balance_cents if snapshot else 0) + tail_total,
+                created_at=entry.created_at
+            ))
+        return entry
+
+    def record_disbursement(self, loan):
+        return self.record(loan.id, DISBURSEMENT, loan.amount_cents)
+
+    def record_payment(self, payment, applied_cents):
+        """applied_cents is the part of the payment that reduced the balance (it is clamped at zero)."""
+        return self.record(payment.loan_id, PAYMENT, -applied_cents, payment_id=payment.id)
+
+    def record_reversal(self, payment):
+        """Puts back whatever the payment's ledger entries took off the balance; returns the cents restored.
+
+        Returns None and records nothing when the payment has no ledger entries, i.e. it was
+        approved before the ledger existed and 'flask backfill-ledger' has not run yet.
+        """
+        entry_count, total = db.session.query(
+            func.count(), func.coalesce(func.sum(LedgerEntryModel.amount_cents), 0)
+        ).filter(LedgerEntryModel.payment_id == payment.id).one()
+        if entry_count == 0:
+            return None
+
+        applied = -total
+        if applied > 0:
+            self.record(payment.loan_id, REVERSAL, applied, payment_id=payment.id)
+        return applied
+
+    # --- Reads ---
+
+    def get_balance(self, loan_id, at=None):
+        """Balance of a loan now, or as of datetime 'at': one snapshot read plus a short tail sum."""
+        snapshot = self._latest_snapshot(loan_id, at)
+        _, tail_total = self._tail(loan_id, snapshot, at=at)
+        return (snapshot.balance_cents if snapshot else 0) + tail_total
+
+    def _latest_snapshot(self, loan_id, at=None):
+        query = LoanBalanceSnapshotModel.query.filter_by(loan_id=loan_id)
+        if at is not None:
+            query = query.filter(LoanBalanceSnapshotModel.created_at <= at)
+        return query.order_by(LoanBalanceSnapshotModel.created_at.desc(),
+                              LoanBalanceSnapshotModel.ledger_entry_id.desc()).first()
+
+    def _tail(self, loan_id, snapshot=None, until=None, at=None):
+        """(count, sum) of a loan's entries after the snapshot, up to entry 'until' and/or datetime 'at'."""
+        query = db.session.query(func.count(), func.coalesce(func.sum(LedgerEntryModel.amount_cents), 0)).filter(
+            LedgerEntryModel.loan_id == loan_id)
+        if snapshot is not None:
+            query = query.filter(entry_key() > tuple_(snapshot.created_at, snapshot.ledger_entry_id))
+        if until is not None:
+            query = query.filter(entry_key() <= tuple_(until.created_at, until.id))
+        if at is not None:
+            query = query.filter(LedgerEntryModel.created_at <= at)
+        return query.one()
+
+    # --- Maintenance ---
+
+    def backfill(self, loan_repo, batch_size=500):
+        """Writes ledger history for approved/completed loans without a disbursement entry. Returns loans backfilled.
+
+        A loan may already have entries for payments approved after the ledger was
+        deployed; those payments are not recorded again, but still count toward the
+        running balance. Loans are read in id-ordered batches; each batch's payments
+        and existing entries come from one IN query each.
+        """
+        backfilled = 0
+        last_id = 0
+        while True:
+            loans = LoanModel.query.filter(
+                LoanModel.id > last_id,
+                LoanModel.status.in_(('Approved', 'Completed')),
+                ~LoanModel.id.in_(db.session.query(LedgerEntryModel.loan_id).filter(
+                    LedgerEntryModel.entry_type == DISBURSEMENT))
+            ).order_by(LoanModel.id).limit(batch_size).all()
+            if not loans:
+                return backfilled
+            last_id = loans[-1].id
+            loan_ids = [loan.id for loan in loans]
+
+            payments = loan_repo.get_payments_by_loan_ids(loan_ids, status='Approved')
+            # payment_id -> net cents already in the ledger for it (negative for an applied payment)
+            recorded = dict(db.session.query(
+                LedgerEntryModel.payment_id, func.sum(LedgerEntryModel.amount_cents)
+            ).filter(
+                LedgerEntryModel.loan_id.in_(loan_ids), LedgerEntryModel.payment_id.isnot(None)
+            ).group_by(LedgerEntryModel.payment_id).all())
+
+            for loan in loans:
+                self.record(loan.id, DISBURSEMENT, loan.amount_cents, created_at=loan.application_date)
+                balance = loan.amount_cents
+                for payment in payments[loan.id]:
+                    if payment.id in recorded:
+                        balance += recorded[payment.id]
+                        continue
+                    applied = min(payment.amount_cents, balance)
+                    balance -= applied
+                    self.record(loan.id, PAYMENT, -applied, payment_id=payment.id, created_at=payment.payment_date)
+                backfilled += 1
+            db.session.commit()
+            # Keep memory flat across batches
+            loan_repo.clear_cache()
+            db.session.expunge_all()
+
+    def verify(self, batch_size=500):
+        """Re-derives every loan's balance from the ledger in id-ordered batches.
+
+        Yields (loan_id, at, stored_cents, ledger_cents, snapshot_path_cents) for each mismatch:
+        - at=None: the current stored balance, the full ledger sum and the snapshot+tail
+          balance disagree. Pending and denied loans are expected to have no ledger balance.
+        - at=<datetime>: a balance snapshot taken at that time does not equal the sum of the
+          entries it covers, so historical get_balance(at=...) reads would be wrong. stored_cents
+          is None and snapshot_path_cents is the snapshot's balance.
+        """
+        last_id = 0
+        while True:
+            loans = db.session.query(LoanModel.id, LoanModel.status, LoanModel.balance_cents).filter(
+                LoanModel.id > last_id).order_by(LoanModel.id).limit(batch_size).all()
+            if not loans:
+                return
+            last_id = loans[-1].id
+            loan_ids = [loan.id for loan in loans]
+
+            full_sums = dict(db.session.query(
+                LedgerEntryModel.loan_id, func.sum(LedgerEntryModel.amount_cents)
+            ).filter(LedgerEntryModel.loan_id.in_(loan_ids)).group_by(LedgerEntryModel.loan_id).all())
+
+            # Every snapshot with the sum of the entries it should cover, oldest first per loan
+            covered = db.session.query(func.coalesce(func.sum(LedgerEntryModel.amount_cents), 0)).filter(
+                LedgerEntryModel.loan_id == LoanBalanceSnapshotModel.loan_id,
+                entry_key() <= snapshot_key()
+            ).scalar_subquery()
+            latest = {}
+            for loan_id, created_at, balance, covered_balance in db.session.query(
+                LoanBalanceSnapshotModel.loan_id, LoanBalanceSnapshotModel.created_at,
+                LoanBalanceSnapshotModel.balance_cents, covered
+            ).filter(LoanBalanceSnapshotModel.loan_id.in_(loan_ids)).order_by(
+                LoanBalanceSnapshotModel.loan_id, *snapshot_key().clauses
+            ):
+                latest[loan_id] = balance
+                if balance != covered_balance:
+                    yield loan_id, created_at, None, covered_balance, balance
+
+            tails = {}
+            if latest:
+                newer = aliased(LoanBalanceSnapshotModel)
+                tails = dict(db.session.query(
+                    LedgerEntryModel.loan_id, func.sum(LedgerEntryModel.amount_cents)
+                ).join(LoanBalanceSnapshotModel, and_(
+                    LoanBalanceSnapshotModel.loan_id == LedgerEntryModel.loan_id,
+                    entry_key() > snapshot_key()
+                )).filter(
+                    LedgerEntryModel.loan_id.in_(loan_ids),
+                    ~exists().where(newer.loan_id == LoanBalanceSnapshotModel.loan_id,
+                                    snapshot_key(newer) > snapshot_key())
+                ).group_by(LedgerEntryModel.loan_id).all())
+
+            for loan_id, status, stored in loans:
+                ledger_balance = full_sums.get(loan_id, 0)
+                if loan_id in latest:
+                    snapshot_balance = latest[loan_id] + tails.get(loan_id, 0)
+                else:
+                    snapshot_balance = ledger_balance
+                expected = stored if status in ('Approved', 'Completed') else 0
+                if not (expected == ledger_balance == snapshot_balance):
+                    yield loan_id, None, stored, ledger_balance, snapshot_balance
+
@@ -0,0 +1,47 @@
+# money.py (Integer minor-unit helpers)
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# All money columns store centavos (1/100 of a peso) as integers so that
+# balances never drift and SQL SUM() totals are exact.
+CENTS_PER_UNIT = 100
+
+
+def to_cents(value):
+    """Converts user input (str/int/Decimal) in pesos to integer cents, rounding half-up.
+
+    Raises ValueError for empty or non-numeric input.
+    """
+    if value is None or (isinstance(value, str) and not value.strip()):
+        raise ValueError("Amount is required.")
+    try:
+        # str() first so floats are converted from their shortest repr, not their binary value
+        amount = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {value!r}")
+    if not amount.is_finite():
+        raise ValueError(f"Invalid amount: {value!r}")
+    return int((amount * CENTS_PER_UNIT).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    """Converts integer cents to an exact Decimal amount in pesos."""
+    return Decimal(cents or 0) / CENTS_PER_UNIT
+
+
+def format_money(cents):
+    """Formats integer cents for display, e.g. 123456 -> '1,234.56'."""
+    return f"{from_cents(cents):,.2f}"
+
+
+def monthly_payment_cents(principal_cents, interest_rate, term_months):
+    """Fixed-rate amortized monthly payment in cents (annual interest_rate in percent)."""
+    r = Decimal(str(interest_rate)) / 100 / 12  # Monthly interest rate
+    n = term_months  # Total number of payments
+    principal = Decimal(principal_cents)
+
+    if r > 0 and n > 0:
+        payment = principal * (r * (1 + r) ** n) / ((1 + r) ** n - 1)
+    else:
+        payment = principal / n if n > 0 else principal
+    return int(payment.quantize(Decimal("1"), rounding=ROUND_HALF_UP))
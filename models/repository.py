@@ -0,0 +1,217 @@
+from .db import db
+from .post import LoanModel, PaymentModel
+from .user import UserModel
+from flask import current_app, g
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+
+# -----------------------------------------------------------
+# Loan / Payment Repository
+#
+# All loan and payment reads go through here. Objects fetched during a request
+# are kept in a per-request identity cache (on flask.g), list pages use
+# column-only queries with the borrower's name joined in, and related payments
+# are fetched in one IN query per batch of loans.
+# -----------------------------------------------------------
+
+class LoanRepository:
+    def __init__(self, db_connection):
+        self.db = db_connection
+
+    # --- Per-request identity cache ---
+
+    def _cache(self, name):
+        """Dict stored on flask.g, so it is dropped automatically when the request ends."""
+        return g.setdefault(f"loan_repo_{name}", {})
+
+    def clear_cache(self):
+        """Drops cached objects; long-running jobs call this between batches."""
+        for name in ('loans', 'payments'):
+            g.pop(f"loan_repo_{name}", None)
+
+    def _remember(self, name, objects):
+        cache = self._cache(name)
+        for obj in objects:
+            cache[obj.id] = obj
+        return objects
+
+    # --- Single objects ---
+
+    def get_loan(self, loan_id, with_borrower=False):
+        loans = self._cache('loans')
+        loan = loans.get(loan_id)
+        if loan is None:
+            query = LoanModel.query
+            if with_borrower:
+                query = query.options(joinedload(LoanModel.borrower))
+            loan = query.filter_by(id=loan_id).first()
+            if loan is not None:
+                loans[loan_id] = loan
+        return loan
+
+    def get_payment(self, payment_id):
+        payments = self._cache('payments')
+        payment = payments.get(payment_id)
+        if payment is None:
+            payment = db.session.get(PaymentModel, payment_id)
+            if payment is not None:
+                payments[payment_id] = payment
+        return payment
+
+    # --- Borrower views ---
+
+    def get_user_loans(self, user_id, status='Approved'):
+        return self._remember('loans', LoanModel.query.filter_by(user_id=user_id, status=status).all())
+
+    def get_payable_loans(self, user_id):
+        """Approved loans that still have a balance, cached so a later get_loan() is free."""
+        return self._remember('loans', LoanModel.query.filter(
+            LoanModel.user_id == user_id,
+            LoanModel.status == 'Approved',
+            LoanModel.balance_cents > 0
+        ).all())
+
+    def get_user_payments(self, user_id, status='Approved'):
+        return self._remember('payments', PaymentModel.query.filter_by(user_id=user_id, status=status).order_by(
+            PaymentModel.payment_date.desc()).all())
+
+    # --- Batched loaders ---
+
+    def get_payments_by_loan_ids(self, loan_ids, status=None):
+        """{loan_id: [payments, oldest first]} for all given loans, in one IN query."""
+        loan_ids = set(loan_ids)
+        grouped = {loan_id: [] for loan_id in loan_ids}
+        if not loan_ids:
+            return grouped
+
+        query = PaymentModel.query.filter(PaymentModel.loan_id.in_(loan_ids))
+        if status is not None:
+            query = query.filter(PaymentModel.status == status)
+        for payment in self._remember('payments', query.order_by(PaymentModel.payment_date).all()):
+            grouped[payment.loan_id].append(payment)
+        return grouped
+
+    # --- Column-only list queries (rows, not ORM objects) ---
+
+    def count_all(self):
+        """(user_count, loan_count, payment_count) in a single query."""
+        return db.session.query(
+            select(func.count()).select_from(UserModel).scalar_subquery(),
+            select(func.count()).select_from(LoanModel).scalar_subquery(),
+            select(func.count()).select_from(PaymentModel).scalar_subquery()
+        ).one()
+
+    def has_users(self):
+        return db.session.query(select(UserModel.id).exists()).scalar()
+
+    def has_loans(self):
+        return db.session.query(select(LoanModel.id).exists()).scalar()
+
+    def has_payments(self):
+        return db.session.query(select(PaymentModel.id).exists()).scalar()
+
+    def list_users(self, approved=None):
+        query = db.session.query(UserModel.id, UserModel.fullname, UserModel.email, UserModel.role,
+                                 UserModel.is_approved)
+        if approved is not None:
+            query = query.filter(UserModel.is_approved == approved)
+        return query.order_by(UserModel.id.asc())
+
+    def list_loans(self, status=None):
+        """Loan rows with the borrower's name (None if the user was deleted); newest application first."""
+        query = db.session.query(
+            LoanModel.id, LoanModel.amount_cents, LoanModel.balance_cents, LoanModel.interest_rate,
+            LoanModel.term_months, LoanModel.status, LoanModel.application_date,
+            UserModel.fullname.label('borrower_name')
+        ).outerjoin(UserModel, LoanModel.user_id == UserModel.id)
+        if status is not None:
+            query = query.filter(LoanModel.status == status)
+        return query.order_by(LoanModel.application_date.desc())
+
+    def list_payments(self, status=None):
+        """Payment rows with the borrower's name (None if the user was deleted); newest payment first."""
+        query = db.session.query(
+            PaymentModel.id, PaymentModel.loan_id, PaymentModel.amount_cents, PaymentModel.method,
+            PaymentModel.status, PaymentModel.payment_date,
+            UserModel.fullname.label('borrower_name')
+        ).outerjoin(UserModel, PaymentModel.user_id == UserModel.id)
+        if status is not None:
+            query = query.filter(PaymentModel.status == status)
+        return query.order_by(PaymentModel.payment_date.desc())
+
+    # --- Writes ---
+
+    def create_loan(self, user_id, amount_cents, interest_rate, term_months):
+        """Creates a new loan application in the database with status='Pending'."""
+        new_loan = LoanModel(
+            user_id=user_id,
+            amount_cents=amount_cents,
+            interest_rate=interest_rate,
+            term_months=term_months,
+            balance_cents=amount_cents,  # CRITICAL: Initial balance equals the amount
+            status='Pending'
+        )
+        try:
+            db.session.add(new_loan)
+            db.session.commit()
+            return True
+        except Exception as e:
+            current_app.logger.error(f"Error creating loan: {e}")
+            db.session.rollback()
+            return False
+
+    def create_payment(self, user_id, loan_id, amount_cents, method):
+        """Creates a new payment request in the database with status='Pending'."""
+        new_payment = PaymentModel(
+            user_id=user_id,
+            loan_id=loan_id,
+            amount_cents=amount_cents,
+            method=method,
+            status='Pending'
+        )
+        try:
+            db.session.add(new_payment)
+            db.session.commit()
+            return True
+        except Exception as e:
+            current_app.logger.error(f"Error creating payment: {e}")
+            db.session.rollback()
+            return False
+
+    # --- Portfolio Aggregates (computed in SQL over the integer cent columns) ---
+
+    # strftime() formats used to bucket payment_date by period
+    PERIOD_FORMATS = {'day': '%Y-%m-%d', 'month': '%Y-%m', 'year': '%Y'}
+
+    def get_total_outstanding(self):
+        """Sum of remaining balances on approved loans, in cents."""
+        return db.session.query(func.coalesce(func.sum(LoanModel.balance_cents), 0)).filter(
+            LoanModel.status == 'Approved').scalar()
+
+    def get_status_totals(self):
+        """Loan count, principal and balance per status, in cents."""
+        rows = db.session.query(
+            LoanModel.status,
+            func.count(),
+            func.coalesce(func.sum(LoanModel.amount_cents), 0),
+            func.coalesce(func.sum(LoanModel.balance_cents), 0)
+        ).group_by(LoanModel.status).all()
+        return [
+            {'status': status, 'loan_count': count, 'amount_cents': amount, 'balance_cents': balance}
+            for status, count, amount, balance in rows
+        ]
+
+    def get_collections_by_period(self, period='month'):
+        """Approved payment totals per day/month/year, oldest first, in cents."""
+        if period not in self.PERIOD_FORMATS:
+            raise ValueError(f"Unknown period: {period}")
+        bucket = func.strftime(self.PERIOD_FORMATS[period], PaymentModel.payment_date)
+        rows = db.session.query(
+            bucket,
+            func.count(),
+            func.coalesce(func.sum(PaymentModel.amount_cents), 0)
+        ).filter(PaymentModel.status == 'Approved').group_by(bucket).order_by(bucket).all()
+        return [
+            {'period': label, 'payment_count': count, 'collected_cents': total}
+            for label, count, total in rows
+        ]
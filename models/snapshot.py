@@ -0,0 +1,248 @@
+from .db import db
+from .post import LoanModel, PaymentModel
+from datetime import date, datetime, time, timedelta
+from heapq import merge
+from sqlalchemy import Integer, case, cast, func, insert
+
+# -----------------------------------------------------------
+# 1. SQLAlchemy Model Definition
+# -----------------------------------------------------------
+
+class PortfolioSnapshotModel(db.Model):
+    """One aggregate figure for one day, e.g. ('2025-10-26', 'collected_cents', 'Gcash', 150000)."""
+    __tablename__ = 'portfolio_snapshot'
+    __table_args__ = (
+        db.UniqueConstraint('snapshot_date', 'metric', 'key', name='uq_snapshot_date_metric_key'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    snapshot_date = db.Column(db.Date, nullable=False)
+    metric = db.Column(db.String(50), nullable=False)
+    key = db.Column(db.String(50), nullable=False, default='')  # Dimension: method, status or aging bucket
+    value = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f"Snapshot('{self.snapshot_date}', '{self.metric}', '{self.key}', {self.value})"
+
+
+# Aging buckets by whole days (floored) from a loan's last approved payment, or its
+# application date, to the end of the snapshot day
+AGING_BUCKETS = (('0-30', 30), ('31-60', 60), ('61-90', 90), ('90+', None))
+
+
+def aging_bucket(days):
+    for label, limit in AGING_BUCKETS:
+        if limit is None or days <= limit:
+            return label
+
+
+def snapshot_rows(day, outstanding_cents, open_loans, applications, collections, aging):
+    """Flattens one day's aggregates into portfolio_snapshot rows.
+
+    applications: {status: count}, collections: {method: (count, cents)}, aging: {bucket: cents}
+    """
+    rows = [
+        {'snapshot_date': day, 'metric': 'outstanding_cents', 'key': '', 'value': outstanding_cents},
+        {'snapshot_date': day, 'metric': 'open_loans', 'key': '', 'value': open_loans},
+    ]
+    for status, count in applications.items():
+        rows.append({'snapshot_date': day, 'metric': 'applications', 'key': status, 'value': count})
+    for method, (count, cents) in collections.items():
+        rows.append({'snapshot_date': day, 'metric': 'collected_count', 'key': method, 'value': count})
+        rows.append({'snapshot_date': day, 'metric': 'collected_cents', 'key': method, 'value': cents})
+    for bucket, cents in aging.items():
+        rows.append({'snapshot_date': day, 'metric': 'aging_cents', 'key': bucket, 'value': cents})
+    return rows
+
+
+# -----------------------------------------------------------
+# 2. Repository Class
+# -----------------------------------------------------------
+
+class PortfolioSnapshot:
+    # 'applications' rows count each day's applications by the loan's *current* status, in
+    # both the nightly job and the backfill. The nightly job re-counts this many trailing days
+    # so that approvals/denials made after the application day are reflected in the history.
+    APPLICATION_REFRESH_DAYS = 90
+
+    def __init__(self, db_connection):
+        self.db = db_connection
+
+    def take_snapshot(self, day):
+        """Computes the aggregates for one day from the live tables and replaces that day's rows.
+
+        Meant to run nightly for the day that just ended: the outstanding balance
+        and aging are read from the loans' current state. The 'applications' rows of
+        the trailing APPLICATION_REFRESH_DAYS days are re-counted by current status.
+        """
+        start = datetime.combine(day, time.min)
+        end = start + timedelta(days=1)
+
+        outstanding, open_loans = db.session.query(
+            func.coalesce(func.sum(LoanModel.balance_cents), 0), func.count()
+        ).filter(LoanModel.status == 'Approved').one()
+
+        refresh_from = day - timedelta(days=self.APPLICATION_REFRESH_DAYS)
+        application_day = func.date(LoanModel.application_date)
+        application_rows = [
+            {'snapshot_date': date.fromisoformat(applied_on), 'metric': 'applications', 'key': status,
+             'value': count}
+            for applied_on, status, count in db.session.query(
+                application_day, LoanModel.status, func.count()
+            ).filter(
+                LoanModel.application_date >= datetime.combine(refresh_from, time.min),
+                LoanModel.application_date < end
+            ).group_by(application_day, LoanModel.status).all()
+        ]
+
+        collections = {
+            method: (count, cents) for method, count, cents in db.session.query(
+                PaymentModel.method, func.count(), func.sum(PaymentModel.amount_cents)
+            ).filter(
+                PaymentModel.status == 'Approved',
+                PaymentModel.payment_date >= start, PaymentModel.payment_date < end
+            ).group_by(PaymentModel.method).all()
+        }
+
+        last_paid = db.session.query(
+            PaymentModel.loan_id, func.max(PaymentModel.payment_date).label('last_paid')
+        ).filter(PaymentModel.status == 'Approved').group_by(PaymentModel.loan_id).subquery()
+        # CAST truncates the fractional day count, matching timedelta.days in backfill()
+        age_days = cast(func.julianday(end) - func.julianday(
+            func.coalesce(last_paid.c.last_paid, LoanModel.application_date)), Integer)
+        bucket = case(
+            *[(age_days <= limit, label) for label, limit in AGING_BUCKETS if limit is not None],
+            else_=AGING_BUCKETS[-1][0]
+        )
+        aging = dict(db.session.query(bucket, func.sum(LoanModel.balance_cents)).outerjoin(
+            last_paid, last_paid.c.loan_id == LoanModel.id
+        ).filter(LoanModel.status == 'Approved').group_by(bucket).all())
+
+        try:
+            PortfolioSnapshotModel.query.filter_by(snapshot_date=day).delete()
+            PortfolioSnapshotModel.query.filter(
+                PortfolioSnapshotModel.metric == 'applications',
+                PortfolioSnapshotModel.snapshot_date >= refresh_from,
+                PortfolioSnapshotModel.snapshot_date <= day
+            ).delete()
+            db.session.execute(insert(PortfolioSnapshotModel),
+                               snapshot_rows(day, outstanding, open_loans, {}, collections, aging) + application_rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def backfill(self, until=None, batch_size=1000):
+        """Rebuilds the whole snapshot history in one pass over loans and payments ordered by date.
+
+        Loans count as disbursed on application_date and approved payments as
+        collected on payment_date. Only currently open loans are held in memory.
+        Returns the number of days written.
+
+        Limitation: approval dates are not recorded, so every currently Approved or
+        Completed loan is treated as outstanding from its application_date, including
+        the time it sat in Pending. Backfilled outstanding balances and aging for past
+        days are therefore overstated compared with rows written by take_snapshot().
+        """
+        until = until or date.today() - timedelta(days=1)
+
+        loans = db.session.query(
+            LoanModel.application_date, LoanModel.id, LoanModel.status, LoanModel.amount_cents
+        ).filter(LoanModel.application_date.isnot(None)).order_by(
+            LoanModel.application_date).yield_per(batch_size)
+        payments = db.session.query(
+            PaymentModel.payment_date, PaymentModel.loan_id, PaymentModel.method, PaymentModel.amount_cents
+        ).filter(PaymentModel.status == 'Approved').order_by(
+            PaymentModel.payment_date).yield_per(batch_size)
+        # Tag each row so the merged stream knows what kind of event it is
+        events = merge(
+            (('loan', row) for row in loans),
+            (('payment', row) for row in payments),
+            key=lambda event: event[1][0]
+        )
+
+        balances = {}  # loan_id -> remaining cents, open loans only
+        last_activity = {}  # loan_id -> datetime of disbursement or last payment
+        day = None
+        applications, collections = {}, {}
+        pending_rows, days_written = [], 0
+
+        def close_day(current):
+            aging = {}
+            day_end = datetime.combine(current + timedelta(days=1), time.min)
+            for loan_id, balance in balances.items():
+                label = aging_bucket((day_end - last_activity[loan_id]).days)
+                aging[label] = aging.get(label, 0) + balance
+            return snapshot_rows(current, sum(balances.values()), len(balances), applications, collections, aging)
+
+        try:
+            PortfolioSnapshotModel.query.delete()
+            for kind, row in events:
+                event_day = row[0].date()
+                if event_day > until:
+                    break
+                while day is not None and day < event_day:
+                    pending_rows.extend(close_day(day))
+                    days_written += 1
+                    applications, collections = {}, {}
+                    day += timedelta(days=1)
+                    if len(pending_rows) >= batch_size:
+                        db.session.execute(insert(PortfolioSnapshotModel), pending_rows)
+                        pending_rows = []
+                day = day or event_day
+
+                if kind == 'loan':
+                    _, loan_id, status, amount_cents = row
+                    applications[status] = applications.get(status, 0) + 1
+                    if status in ('Approved', 'Completed'):
+                        balances[loan_id] = amount_cents
+                        last_activity[loan_id] = row[0]
+                else:
+                    paid_at, loan_id, method, amount_cents = row
+                    count, cents = collections.get(method, (0, 0))
+                    collections[method] = (count + 1, cents + amount_cents)
+                    if loan_id in balances:
+                        balances[loan_id] -= amount_cents
+                        last_activity[loan_id] = paid_at
+                        if balances[loan_id] <= 0:
+                            del balances[loan_id]
+                            del last_activity[loan_id]
+
+            # Carry the final state forward to 'until' so the history has no gaps
+            while day is not None and day <= until:
+                pending_rows.extend(close_day(day))
+                days_written += 1
+                applications, collections = {}, {}
+                day += timedelta(days=1)
+            if pending_rows:
+                db.session.execute(insert(PortfolioSnapshotModel), pending_rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return days_written
+
+    def get_history(self, since):
+        """Snapshot rows from 'since' onwards, pivoted into one dict per day (oldest first)."""
+        rows = db.session.query(
+            PortfolioSnapshotModel.snapshot_date, PortfolioSnapshotModel.metric,
+            PortfolioSnapshotModel.key, PortfolioSnapshotModel.value
+        ).filter(PortfolioSnapshotModel.snapshot_date >= since).order_by(
+            PortfolioSnapshotModel.snapshot_date).all()
+
+        history = {}
+        for snapshot_date, metric, key, value in rows:
+            day = history.setdefault(snapshot_date, {
+                'date': snapshot_date.isoformat(), 'outstanding_cents': 0, 'open_loans': 0,
+                'applications': {}, 'collected_cents': {}, 'collected_count': {}, 'aging_cents': {},
+            })
+            if key:
+                day[metric][key] = value
+            else:
+                day[metric] = value
+
+        for day in history.values():
+            decided = sum(count for status, count in day['applications'].items() if status != 'Pending')
+            approved = day['applications'].get('Approved', 0) + day['applications'].get('Completed', 0)
+            day['approval_rate'] = round(approved / decided, 4) if decided else None
+            day['collected_total_cents'] = sum(day['collected_cents'].values())
+        return list(history.values())
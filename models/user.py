@@ -36,7 +36,7 @@ class UserModel(db.Model):
 
 
 # -----------------------------------------------------------
-# 2. Repository Class (All methods fixed to use app_context)
+# 2. Repository Class
 # -----------------------------------------------------------
 class User:
     def __init__(self, db_connection):
@@ -46,67 +46,61 @@ class User:
         new_user = UserModel(fullname=fullname, email=email, role=role, is_approved=False)
         new_user.set_password(password)
 
-        with current_app.app_context(): # FIX: Added app_context
-            try:
-                db.session.add(new_user)
-                db.session.commit()
-                return True
-            except Exception as e:
-                current_app.logger.error(f"Error creating user: {e}")
-                db.session.rollback()
-                return False
+        try:
+            db.session.add(new_user)
+            db.session.commit()
+            return True
+        except Exception as e:
+            current_app.logger.error(f"Error creating user: {e}")
+            db.session.rollback()
+            return False
 
     def get_user_by_email(self, email):
-        with current_app.app_context(): # FIX: Added app_context
-            return UserModel.query.filter_by(email=email).first()
+        return UserModel.query.filter_by(email=email).first()
 
     def get_user_by_id(self, user_id):
-        with current_app.app_context(): # FIX: Added app_context
-            return UserModel.query.get(user_id)
+        return UserModel.query.get(user_id)
 
     def get_all_users(self):
-        with current_app.app_context(): # FIX: Added app_context
-            return UserModel.query.order_by(desc(UserModel.id)).all()
+        return UserModel.query.order_by(desc(UserModel.id)).all()
 
     def update_user(self, user_id, fullname=None, email=None, password=None, is_approved=None):
-        with current_app.app_context(): # FIX: Added app_context
-            user = UserModel.query.get(user_id) # Using query inside context
-            if not user: return False
-
-            updated = False
-            if fullname is not None:
-                user.fullname = fullname
-                updated = True
-            if email is not None:
-                user.email = email
-                updated = True
-            if password is not None:
-                user.set_password(password)
-                updated = True
-            if is_approved is not None:
-                user.is_approved = is_approved
-                updated = True
-
-            if updated:
-                try:
-                    db.session.commit()
-                    return True
-                except Exception as e:
-                    current_app.logger.error(f"Error updating user: {e}")
-                    db.session.rollback()
-                    return False
-            return False
-
-    def delete_user(self, user_id):
-        with current_app.app_context(): # FIX: Added app_context
-            user = UserModel.query.get(user_id) # Using query inside context
-            if not user: return False
-
+        user = UserModel.query.get(user_id)
+        if not user: return False
+
+        updated = False
+        if fullname is not None:
+            user.fullname = fullname
+            updated = True
+        if email is not None:
+            user.email = email
+            updated = True
+        if password is not None:
+            user.set_password(password)
+            updated = True
+        if is_approved is not None:
+            user.is_approved = is_approved
+            updated = True
+
+        if updated:
             try:
-                db.session.delete(user)
                 db.session.commit()
                 return True
             except Exception as e:
-                current_app.logger.error(f"Error deleting user: {e}")
+                current_app.logger.error(f"Error updating user: {e}")
                 db.session.rollback()
-                return False
\ No newline at end of file
+                return False
+        return False
+
+    def delete_user(self, user_id):
+        user = UserModel.query.get(user_id)
+        if not user: return False
+
+        try:
+            db.session.delete(user)
+            db.session.commit()
+            return True
+        except Exception as e:
+            current_app.logger.error(f"Error deleting user: {e}")
+            db.session.rollback()
+            return False
\ No newline at end of file
@@ -0,0 +1,179 @@
+# profiler.py (On-demand per-request profiling)
+
+import cProfile
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import g, request, session
+
+# Only one request is profiled at a time per process: cProfile hooks are interpreter-wide
+# on newer Pythons, and overlapping profiles would mix samples from unrelated requests.
+_profiling_lock = threading.Lock()
+
+
+# -----------------------------------------------------------
+# 1. Stack Sampler (collapsed-stack output for flamegraphs)
+# -----------------------------------------------------------
+
+class StackSampler:
+    """Samples the stack of one thread at a fixed interval and counts collapsed stacks."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            # Collapsed format is root-first, frames separated by ';'
+            self.stacks[";".join(reversed(names))] += 1
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.items():
+                f.write(f"{stack} {count}\n")
+
+
+# -----------------------------------------------------------
+# 2. Flask Hooks
+# -----------------------------------------------------------
+
+def init_profiler(app):
+    """Registers opt-in profiling hooks on the app.
+
+    Profiling only runs when PROFILER_ENABLED is set, the user is an Admin,
+    the request carries the 'X-Profile: 1' header or '?profile=1', and the
+    request passes the PROFILER_SAMPLE_RATE dice roll. Every other request
+    pays for a single config lookup.
+    """
+    app.config.setdefault("PROFILER_ENABLED", False)
+    app.config.setdefault("PROFILER_DIR", os.path.join(app.instance_path, "profiles"))
+    app.config.setdefault("PROFILER_SAMPLE_RATE", 1.0)
+    app.config.setdefault("PROFILER_MODE", "cprofile")  # 'cprofile' (.prof) or 'sample' (.collapsed)
+    app.config.setdefault("PROFILER_SAMPLE_INTERVAL", 0.005)  # seconds, used by 'sample' mode
+    app.config.setdefault("PROFILER_MAX_FILES", 50)
+
+    @app.before_request
+    def start_profiling():
+        if not app.config["PROFILER_ENABLED"]:
+            return
+        if request.headers.get("X-Profile") != "1" and request.args.get("profile") != "1":
+            return
+        if session.get("role") != "Admin":
+            return
+        if random.random() >= app.config["PROFILER_SAMPLE_RATE"]:
+            return
+        if not _profiling_lock.acquire(blocking=False):
+            return  # Another request is already being profiled
+
+        if app.config["PROFILER_MODE"] == "sample":
+            profiler = StackSampler(threading.get_ident(), app.config["PROFILER_SAMPLE_INTERVAL"])
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        g.profiler = profiler
+        g.profiler_started = time.perf_counter()
+
+    @app.after_request
+    def stop_profiling(response):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return response
+
+        started = g.pop("profiler_started")
+        filename = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{request.endpoint or 'unknown'}"
+
+        if response.is_streamed:
+            # Streamed pages render after this hook returns, so keep profiling until the
+            # server closes the response. close() runs even when the body is never iterated
+            # (HEAD requests, early disconnects), unlike a generator's finally block.
+            response.call_on_close(lambda: finish_profile(app, profiler, started, filename))
+            return response
+
+        name = finish_profile(app, profiler, started, filename)
+        if name:
+            response.headers["X-Profile-File"] = name
+        return response
+
+    @app.teardown_request
+    def discard_profiling(exc):
+        # after_request is skipped when a view raises; make sure the sampler thread
+        # stops and cProfile is disabled instead of leaking into later requests.
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            g.pop("profiler_started", None)
+            stop_profiler(profiler)
+
+
+def stop_profiler(profiler):
+    """Stops the sampler thread or disables cProfile, and frees the slot for the next profile."""
+    try:
+        if isinstance(profiler, StackSampler):
+            profiler.stop()
+        else:
+            profiler.disable()
+    finally:
+        _profiling_lock.release()
+
+
+def finish_profile(app, profiler, started, filename):
+    """Stops the profiler and writes its dump; returns the file name or None on failure."""
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    stop_profiler(profiler)
+    extension = "collapsed" if isinstance(profiler, StackSampler) else "prof"
+
+    try:
+        directory = app.config["PROFILER_DIR"]
+        os.makedirs(directory, exist_ok=True)
+        filename = f"{filename}-{elapsed_ms:.0f}ms.{extension}"
+        path = os.path.join(directory, filename)
+        if isinstance(profiler, StackSampler):
+            profiler.dump(path)
+        else:
+            profiler.dump_stats(path)
+        rotate_profiles(directory, app.config["PROFILER_MAX_FILES"])
+        return filename
+    except OSError as e:
+        app.logger.error(f"Error writing profile: {e}")
+        return None
+
+
+def rotate_profiles(directory, max_files):
+    """Deletes the oldest profile dumps so at most max_files remain."""
+    dumps = [
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith((".prof", ".collapsed"))
+    ]
+    if len(dumps) <= max_files:
+        return
+
+    dumps.sort(key=os.path.getmtime)
+    for path in dumps[:len(dumps) - max_files]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,127 @@
+# streaming.py (Streamed template rendering and response compression)
+
+import zlib
+
+from flask import Response, get_flashed_messages, request, stream_template
+
+try:
+    import brotli  # Optional: enables 'br' for clients that accept it
+except ImportError:
+    brotli = None
+
+
+# -----------------------------------------------------------
+# 1. Streamed Rendering
+# -----------------------------------------------------------
+
+def stream_page(template_name, buffer_size=8192, **context):
+    """Renders a template as a stream of ~buffer_size chunks instead of one big string.
+
+    Pass lazily-iterated queries (e.g. with .yield_per()) in the context so rows
+    are fetched, rendered and sent in batches rather than held in memory.
+    """
+    # The session cookie is saved before a streamed body is produced, so flashes must be
+    # popped now; base.html reads them from 'flashes' instead of calling get_flashed_messages().
+    context.setdefault("flashes", get_flashed_messages(with_categories=True))
+    chunks = stream_template(template_name, **context)
+    return Response(buffered(chunks, buffer_size), mimetype="text/html")
+
+
+def buffered(chunks, size):
+    """Groups many small template fragments into fewer, larger byte chunks."""
+    pending = []
+    pending_size = 0
+    try:
+        for chunk in chunks:
+            chunk = chunk.encode("utf-8")
+            pending.append(chunk)
+            pending_size += len(chunk)
+            if pending_size >= size:
+                yield b"".join(pending)
+                pending = []
+                pending_size = 0
+        if pending:
+            yield b"".join(pending)
+    finally:
+        # Make sure the template generator (and its request context) is released
+        # even if the client disconnects halfway through.
+        chunks.close()
+
+
+# -----------------------------------------------------------
+# 2. Response Compression
+# -----------------------------------------------------------
+
+class BrotliCompressor:
+    """Adapts brotli.Compressor to the zlib compressobj interface."""
+
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self, mode=zlib.Z_FINISH):
+        if mode == zlib.Z_FINISH:
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def new_compressor(encoding, level):
+    if encoding == "br":
+        return BrotliCompressor(quality=min(level, 11))
+    # wbits=31 produces a gzip header and trailer instead of a raw zlib stream
+    return zlib.compressobj(level, zlib.DEFLATED, 31)
+
+
+def compress_stream(chunks, compressor):
+    """Compresses a response body chunk by chunk, flushing so each chunk can be sent immediately."""
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush(zlib.Z_FINISH)
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def init_compression(app):
+    """Registers an after_request hook that gzip/brotli-compresses text responses."""
+    app.config.setdefault("COMPRESS_LEVEL", 6)
+    app.config.setdefault("COMPRESS_MIN_SIZE", 500)
+    app.config.setdefault("COMPRESS_MIMETYPES", {
+        "text/html", "text/css", "text/plain", "application/json", "application/javascript",
+    })
+
+    encodings = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code < 200 or response.status_code >= 300
+                or response.direct_passthrough
+                or "Content-Encoding" in response.headers
+                or response.mimetype not in app.config["COMPRESS_MIMETYPES"]):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(encodings)
+        if encoding is None:
+            return response
+
+        compressor = new_compressor(encoding, app.config["COMPRESS_LEVEL"])
+        if response.is_streamed:
+            response.response = compress_stream(response.response, compressor)
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < app.config["COMPRESS_MIN_SIZE"]:
+                return response
+            response.set_data(compressor.compress(data) + compressor.flush())
+
+        response.headers["Content-Encoding"] = encoding
+        return response